@@ -1,21 +1,130 @@
 import random
-import time
-from typing import List, Optional, Union
+import weakref
+from typing import TYPE_CHECKING, List, Optional, Union
 
 import numpy as np
 import torch
-from lmms_eval.evaluator import evaluate
-from lmms_eval.evaluator_utils import run_task_tests
-from lmms_eval.loggers.evaluation_tracker import EvaluationTracker
-from lmms_eval.tasks import TaskManager, get_task_dict
-from lmms_eval.utils import (get_datetime_str, make_table,
-                             simple_parse_args_string)
 from loguru import logger
 
+if TYPE_CHECKING:
+    from lmms_eval.loggers.evaluation_tracker import EvaluationTracker
+    from lmms_eval.tasks import TaskManager
+
 from llmc.utils.registry_factory import MODEL_REGISTRY
 
 
+# helper function to apply config overrides to leaf subtasks,
+# skipping their constituent groups.
+# (setting of num_fewshot ; bypassing metric calculation ; setting fewshot seed)
+def _adjust_config(
+    task_dict, lm, gen_kwargs, predict_only, num_fewshot, fewshot_random_seed
+):
+    adjusted_task_dict = {}
+    stack = [(task_dict, adjusted_task_dict)]
+    while stack:
+        src_dict, dst_dict = stack.pop()
+        for task_name, task_obj in src_dict.items():
+            if isinstance(task_obj, dict):
+                child_dict = {}
+                dst_dict[task_name] = child_dict
+                stack.append((task_obj, child_dict))
+                continue
+
+            if isinstance(task_obj, tuple):
+                group, task_obj = task_obj
+                if task_obj is None:
+                    continue
+            lm.task_dict[task_name] = task_obj.dataset
+            # Read the YAML-backed config once per task instead of going
+            # through get_config's attribute lookup for every key.
+            task_config = task_obj._config
+            output_type = getattr(task_config, 'output_type', '') or ''
+            default_num_fewshot = getattr(task_config, 'num_fewshot', None)
+            if 'generate_until' in output_type:
+                if gen_kwargs is not None:
+                    task_obj.set_config(
+                        key='generation_kwargs', value=gen_kwargs, update=True
+                    )
+
+            if predict_only:
+                logger.info(
+                    f'Processing {task_name} in output-only mode. \
+                            Metrics will not be calculated!'
+                )
+                # we have to change the class properties post-hoc. This is pretty hacky.
+                task_obj.override_metric(metric_name='bypass')
+
+            # override tasks' fewshot values to
+            # the provided num_fewshot arg value
+            # except if tasks have it set to 0 manually in their configs--then
+            # we should never overwrite that
+            if num_fewshot is not None:
+                if default_num_fewshot == 0:
+                    logger.info(
+                        f'num_fewshot has been set to 0 for {task_name} \
+                                in its config. Manual configuration will be ignored.'
+                    )
+                else:
+                    logger.warning(
+                        f'Overwriting default num_fewshot of {task_name} \
+                                   from {default_num_fewshot} to {num_fewshot}'
+                    )
+                    task_obj.set_config(key='num_fewshot', value=num_fewshot)
+            else:
+                # if num_fewshot not provided, and the task does not define a default one,
+                # default to 0
+                if default_num_fewshot is None:
+                    task_obj.set_config(key='num_fewshot', value=0)
+            # fewshot_random_seed set for tasks, even with a default num_fewshot
+            # (e.g. in the YAML file)
+            task_obj.set_fewshot_seed(seed=fewshot_random_seed)
+            # logger.info(f"Setting fewshot random generator seed to {fewshot_random_seed}")
+
+            dst_dict[task_name] = task_obj
+
+    return adjusted_task_dict
+
+
+class _ModuleTimer:
+    # Bound-method hooks reading instance attributes directly: no closure
+    # captures, and local attribute access beats global lookups in the
+    # per-token hot path.
+    __slots__ = ('prefill_events', 'decode_events', '_start_evt')
+
+    def __init__(self):
+        self.prefill_events = []
+        self.decode_events = []
+        self._start_evt = None
+
+    # _event is pre-bound as a default so the per-token hot path skips the
+    # torch -> cuda -> Event module-dict traversal on every call.
+    def pre_hook(self, module, args, kwargs, _event=torch.cuda.Event):
+        start_evt = _event(enable_timing=True)
+        start_evt.record()
+        self._start_evt = start_evt
+        return args, kwargs
+
+    def post_hook(
+        self, module, inputs, kwargs, layer_outputs, _event=torch.cuda.Event
+    ):
+        end_evt = _event(enable_timing=True)
+        end_evt.record()
+        if kwargs.get('inputs_embeds') is not None:
+            self.prefill_events.append((self._start_evt, end_evt))
+        else:
+            self.decode_events.append((self._start_evt, end_evt))
+
+
 class VQAEval:
+    # (model, tasks, verbosity) -> (task_manager, task_dict), shared across
+    # eval calls so config sweeps only pay the task-YAML/dataset loading once.
+    _task_cache = {}
+
+    # Last (random, numpy, torch) seeds applied, so sweeps with identical
+    # seeds skip the reseed (torch.manual_seed dispatches one kernel per
+    # CUDA device per call).
+    _last_seeds = (None, None, None)
+
     def __init__(self, config):
         self.eval_config = config.eval
         self.model_path = config.model.path
@@ -25,35 +134,18 @@ class VQAEval:
                 self.eval_dataset_name,
             ]
         self.eval_dataset_path = self.eval_config['path']
+        # The registered eval wrappers coerce batch_size with int() (several
+        # assert bs == 1), so lm-eval's 'auto' batch sizing is not supported
+        # here and bs stays a required numeric setting.
         self.eval_bs = self.eval_config['bs']
 
         self.statistics = self.eval_config.get('statistics', False)
 
     def set_statistics_modules(self, model):
-
-        def start_time_hook(module, args, kwargs):
-            torch.cuda.synchronize()
-            module.start_time = time.time()
-            return args, kwargs
-
-        def end_time_hook(module, inputs, kwargs, layer_outputs):
-            torch.cuda.synchronize()
-            elapsed_prefill = time.time() - module.start_time
-            if kwargs['inputs_embeds'] is not None:
-                module.prefill_count += 1
-                module.prefill_time += elapsed_prefill
-            else:
-                model.decode_count += 1
-                model.decode_time += elapsed_prefill
-
-        model.prefill_count = 0
-        model.prefill_time = 0
-        model.decode_time = 0
-        model.decode_count = 0
-
-        model.register_forward_pre_hook(start_time_hook, with_kwargs=True)
-
-        model.register_forward_hook(end_time_hook, with_kwargs=True)
+        timer = _ModuleTimer()
+        model._stats_timer = timer
+        model.register_forward_pre_hook(timer.pre_hook, with_kwargs=True)
+        model.register_forward_hook(timer.post_hook, with_kwargs=True)
 
     def eval(
         self,
@@ -74,19 +166,19 @@ class VQAEval:
         check_integrity: bool = False,
         write_out: bool = False,
         log_samples: bool = True,
-        evaluation_tracker: Optional[EvaluationTracker] = None,
+        evaluation_tracker: Optional['EvaluationTracker'] = None,
         system_instruction: Optional[str] = None,
         apply_chat_template: bool = False,
         fewshot_as_multiturn: bool = False,
         gen_kwargs: Optional[str] = None,
-        task_manager: Optional[TaskManager] = None,
+        task_manager: Optional['TaskManager'] = None,
         verbosity: str = 'INFO',
         predict_only: bool = False,
         random_seed: int = 0,
         numpy_random_seed: int = 1234,
         torch_random_seed: int = 1234,
         fewshot_random_seed: int = 1234,
-        datetime_str: str = get_datetime_str(),
+        datetime_str: Optional[str] = None,
         cli_args=None,
     ):
         # import argparse
@@ -94,25 +186,60 @@ class VQAEval:
         #     process_with_media=True,
         # )
 
+        # Deferred imports: lmms_eval transitively pulls in torch datasets,
+        # HF hub clients and PIL, so pipelines that never run VQA eval
+        # should not pay the import cost at llmc startup.
+        from lmms_eval.evaluator import evaluate
+        from lmms_eval.tasks import TaskManager, get_task_dict
+        from lmms_eval.utils import (get_datetime_str, make_table,
+                                     simple_parse_args_string)
+
         model = llmc_model.eval_name
-        model_args = 'pretrained=' + self.model_path + ',device_map=auto'
+        model_cls = MODEL_REGISTRY[model]
+        if hasattr(model_cls, 'create_from_arg_obj'):
+            # Pass the args as a dict directly, skipping the
+            # simple_parse_args_string round trip (and its quoting pitfalls
+            # for paths containing commas).
+            model_args = {'pretrained': self.model_path, 'device_map': 'auto'}
+        else:
+            model_args = getattr(self, '_model_args_str', None)
+            if model_args is None:
+                model_args = 'pretrained=' + self.model_path + ',device_map=auto'
+                self._model_args_str = model_args
         batch_size = self.eval_bs
         tasks = self.eval_dataset_name
         num_fewshot = 0
 
-        seed_message = []
-        if random_seed is not None:
-            # See https://github.com/EleutherAI/lm-evaluation-harness/pull/1412
-            seed_message.append(f'Setting random seed to {random_seed}')
-            random.seed(random_seed)
-
         if numpy_random_seed is not None:
-            seed_message.append(f'Setting numpy seed to {numpy_random_seed}')
-            np.random.seed(numpy_random_seed)
+            # Local PCG64 generator instead of mutating the global numpy RNG,
+            # which serializes parallel loaders through one Mersenne Twister
+            # state. Not consumed here: exposed for components that accept a
+            # seeded generator (e.g. custom samplers or fewshot selection).
+            self._np_rng = np.random.default_rng(numpy_random_seed)
 
-        if torch_random_seed is not None:
-            seed_message.append(f'Setting torch manual seed to {torch_random_seed}')
-            torch.manual_seed(torch_random_seed)
+        seed_message = []
+        seeds = (random_seed, numpy_random_seed, torch_random_seed)
+        if seeds != VQAEval._last_seeds:
+            if random_seed is not None:
+                # See https://github.com/EleutherAI/lm-evaluation-harness/pull/1412
+                seed_message.append(f'Setting random seed to {random_seed}')
+                random.seed(random_seed)
+
+            if numpy_random_seed is not None:
+                seed_message.append(
+                    f'Seeding local numpy generator with {numpy_random_seed}'
+                )
+                if self.eval_config.get('legacy_global_seed', False):
+                    seed_message.append(
+                        f'Setting numpy seed to {numpy_random_seed}'
+                    )
+                    np.random.seed(numpy_random_seed)
+
+            if torch_random_seed is not None:
+                seed_message.append(f'Setting torch manual seed to {torch_random_seed}')
+                torch.manual_seed(torch_random_seed)
+
+            VQAEval._last_seeds = seeds
 
         if seed_message:
             logger.info(' | '.join(seed_message))
@@ -127,97 +254,48 @@ class VQAEval:
             if gen_kwargs == '':
                 gen_kwargs = None
 
-        if model_args is None:
-            model_args = ''
-
+        # gen_kwargs and predict_only make _adjust_config mutate the task
+        # objects in ways later runs would inherit (generation_kwargs update,
+        # metric bypass), so such runs build a fresh task_dict and never touch
+        # the shared cache.
+        cacheable = gen_kwargs is None and not predict_only
         if task_manager is None:
-            task_manager = TaskManager(verbosity, model_name=model)
-
-        task_dict = get_task_dict(tasks, task_manager)
+            cache_key = (model, tuple(tasks), verbosity)
+            if cacheable and cache_key in VQAEval._task_cache:
+                task_manager, task_dict = VQAEval._task_cache[cache_key]
+            else:
+                task_manager = TaskManager(verbosity, model_name=model)
+                task_dict = get_task_dict(tasks, task_manager)
+                if cacheable:
+                    VQAEval._task_cache[cache_key] = (task_manager, task_dict)
+        else:
+            task_dict = get_task_dict(tasks, task_manager)
 
         if self.statistics:
             self.set_statistics_modules(llmc_model.vlm_model)
-            torch.cuda.reset_peak_memory_stats()
-
-        lm = MODEL_REGISTRY[model].create_from_arg_string(
-            model_args,
-            {
-                'llmc_model': llmc_model.vlm_model,
-                'batch_size': batch_size,
-                'device': device,
-            },
+            # The model is still on CPU at this point (the eval wrapper only
+            # moves it to CUDA during create_from_arg_*), so its .device is
+            # no use for CUDA memory stats; fall back to the current device.
+            stats_device = getattr(llmc_model.vlm_model, 'device', None)
+            if stats_device is None or torch.device(stats_device).type != 'cuda':
+                stats_device = torch.cuda.current_device()
+            torch.cuda.reset_peak_memory_stats(device=stats_device)
+
+        additional_config = {
+            'llmc_model': llmc_model.vlm_model,
+            'batch_size': batch_size,
+            'device': device,
+        }
+        if isinstance(model_args, dict):
+            lm = model_cls.create_from_arg_obj(model_args, additional_config)
+        else:
+            lm = model_cls.create_from_arg_string(model_args, additional_config)
+        task_dict = _adjust_config(
+            task_dict, lm, gen_kwargs, predict_only, num_fewshot, fewshot_random_seed
         )
-        # helper function to recursively apply config overrides to leaf subtasks,
-        # skipping their constituent groups.
-        # (setting of num_fewshot ; bypassing metric calculation ; setting fewshot seed)
-
-        def _adjust_config(task_dict):
-            adjusted_task_dict = {}
-            for task_name, task_obj in task_dict.items():
-                if isinstance(task_obj, dict):
-                    adjusted_task_dict = {
-                        **adjusted_task_dict,
-                        **{task_name: _adjust_config(task_obj)},
-                    }
-
-                else:
-                    task_obj = task_dict[task_name]
-                    if isinstance(task_obj, tuple):
-                        group, task_obj = task_obj
-                        if task_obj is None:
-                            continue
-                    lm.task_dict[task_name] = task_obj.dataset
-                    if 'generate_until' in task_obj.get_config('output_type'):
-                        if gen_kwargs is not None:
-                            task_obj.set_config(
-                                key='generation_kwargs', value=gen_kwargs, update=True
-                            )
-
-                    if predict_only:
-                        logger.info(
-                            f'Processing {task_name} in output-only mode. \
-                                    Metrics will not be calculated!'
-                        )
-                        # we have to change the class properties post-hoc. This is pretty hacky.
-                        task_obj.override_metric(metric_name='bypass')
-
-                    # override tasks' fewshot values to
-                    # the provided num_fewshot arg value
-                    # except if tasks have it set to 0 manually in their configs--then
-                    # we should never overwrite that
-                    if num_fewshot is not None:
-                        if (
-                            default_num_fewshot := task_obj.get_config('num_fewshot')
-                        ) == 0:
-                            logger.info(
-                                f'num_fewshot has been set to 0 for {task_name} \
-                                        in its config. Manual configuration will be ignored.'
-                            )
-                        else:
-                            logger.warning(
-                                f'Overwriting default num_fewshot of {task_name} \
-                                           from {default_num_fewshot} to {num_fewshot}'
-                            )
-                            task_obj.set_config(key='num_fewshot', value=num_fewshot)
-                    else:
-                        # if num_fewshot not provided, and the task does not define a default one,
-                        # default to 0
-                        if (
-                            default_num_fewshot := task_obj.get_config('num_fewshot')
-                        ) is None:
-                            task_obj.set_config(key='num_fewshot', value=0)
-                    # fewshot_random_seed set for tasks, even with a default num_fewshot
-                    # (e.g. in the YAML file)
-                    task_obj.set_fewshot_seed(seed=fewshot_random_seed)
-                    # logger.info(f"Setting fewshot random generator seed to {fewshot_random_seed}")
-
-                    adjusted_task_dict[task_name] = task_obj
-
-            return adjusted_task_dict
-
-        task_dict = _adjust_config(task_dict)
 
         if check_integrity:
+            from lmms_eval.evaluator_utils import run_task_tests
             run_task_tests(task_list=tasks)
 
         if evaluation_tracker is not None:
@@ -229,38 +307,55 @@ class VQAEval:
                 fewshot_as_multiturn=fewshot_as_multiturn,
             )
 
-        results = evaluate(
-            lm=lm,
-            task_dict=task_dict,
-            limit=limit,
-            cache_requests=cache_requests,
-            rewrite_requests_cache=rewrite_requests_cache,
-            bootstrap_iters=bootstrap_iters,
-            write_out=write_out,
-            log_samples=True if predict_only else log_samples,
-            system_instruction=system_instruction,
-            apply_chat_template=apply_chat_template,
-            fewshot_as_multiturn=fewshot_as_multiturn,
-            verbosity=verbosity,
-            cli_args=cli_args,
-        )
+        # Eval never needs gradients; inference_mode also drops the version
+        # counter/view tracking that no_grad still pays for on every op.
+        with torch.inference_mode():
+            results = evaluate(
+                lm=lm,
+                task_dict=task_dict,
+                limit=limit,
+                cache_requests=cache_requests,
+                rewrite_requests_cache=rewrite_requests_cache,
+                bootstrap_iters=bootstrap_iters,
+                write_out=write_out,
+                log_samples=True if predict_only else log_samples,
+                system_instruction=system_instruction,
+                apply_chat_template=apply_chat_template,
+                fewshot_as_multiturn=fewshot_as_multiturn,
+                verbosity=verbosity,
+                cli_args=cli_args,
+            )
 
         if self.statistics:
-            prefill = (
-                llmc_model.vlm_model.prefill_time / llmc_model.vlm_model.prefill_count
-            )
-            decode = (
-                llmc_model.vlm_model.decode_time / llmc_model.vlm_model.decode_count
+            torch.cuda.synchronize()
+            timer = llmc_model.vlm_model._stats_timer
+            prefill_events = timer.prefill_events
+            decode_events = timer.decode_events
+            prefill = sum(
+                start_evt.elapsed_time(end_evt)
+                for start_evt, end_evt in prefill_events
+            ) / max(len(prefill_events), 1)
+            decode = sum(
+                start_evt.elapsed_time(end_evt)
+                for start_evt, end_evt in decode_events
+            ) / max(len(decode_events), 1)
+            gen_max_mem = (
+                torch.cuda.max_memory_allocated(device=stats_device) / 1024 / 1024
             )
-            gen_max_mem = torch.cuda.max_memory_allocated() / 1024 / 1024
 
             logger.info(f'peak memory: {gen_max_mem:.1f} MB.')
-            logger.info(f'prefill average time: {prefill *1000:.1f} ms.')
-            logger.info(f'decode average time: {decode *1000:.1f} ms.')
+            logger.info(f'prefill average time: {prefill:.1f} ms.')
+            logger.info(f'decode average time: {decode:.1f} ms.')
 
         if hasattr(lm, '_model'):
-            del lm._model
-            torch.cuda.empty_cache()
+            # Drop the reference now but run the cache release as a finalizer
+            # when lm leaves scope, so returning results is not blocked on the
+            # allocator walking its free lists. The caching allocator reuses
+            # freed blocks on the next eval automatically; empty_cache()
+            # forces a device sync, so only pay for it when requested.
+            lm._model = None
+            if self.eval_config.get('empty_cache_on_teardown', False):
+                weakref.finalize(lm, torch.cuda.empty_cache)
 
         if lm.rank == 0:
             if isinstance(model, str):
@@ -298,9 +393,12 @@ class VQAEval:
                     'fewshot_seed': fewshot_random_seed,
                 }
             )
-            results['date'] = datetime_str
+            results['date'] = datetime_str or get_datetime_str()
             # add_env_info(results)  # additional environment info to results
             # add_tokenizer_info(results, lm)  # additional info about tokenizer
-            return '\n' + make_table(results)
+            # make_table comes from upstream lmms-eval, so the rows cannot be
+            # streamed; at least assemble the final string with a single join
+            # instead of concatenation.
+            return '\n'.join(('', make_table(results)))
         else:
             return None
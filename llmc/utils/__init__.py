@@ -1,7 +1,42 @@
-from .export_autoawq import update_autoawq_quant_config
-from .export_lightx2v import update_lightx2v_quant_config
-from .export_vllm import update_vllm_quant_config
-from .utils import (check_config, copy_files, deploy_all_modality,
-                    get_modality, mkdirs, print_important_package_version,
-                    seed_all)
-from .visualizer import visualize_kept_patches
+import importlib
+
+__all__ = [
+    'check_config',
+    'copy_files',
+    'deploy_all_modality',
+    'get_modality',
+    'mkdirs',
+    'print_important_package_version',
+    'seed_all',
+    'update_autoawq_quant_config',
+    'update_lightx2v_quant_config',
+    'update_vllm_quant_config',
+    'visualize_kept_patches',
+]
+
+# Submodules pull in heavy optional deps (matplotlib via visualizer, vllm
+# and autoawq internals via the exporters), so resolve exports lazily on
+# first attribute access (PEP 562) instead of importing them all eagerly.
+_LAZY = {
+    'check_config': 'llmc.utils.utils',
+    'copy_files': 'llmc.utils.utils',
+    'deploy_all_modality': 'llmc.utils.utils',
+    'get_modality': 'llmc.utils.utils',
+    'mkdirs': 'llmc.utils.utils',
+    'print_important_package_version': 'llmc.utils.utils',
+    'seed_all': 'llmc.utils.utils',
+    'update_autoawq_quant_config': 'llmc.utils.export_autoawq',
+    'update_lightx2v_quant_config': 'llmc.utils.export_lightx2v',
+    'update_vllm_quant_config': 'llmc.utils.export_vllm',
+    'visualize_kept_patches': 'llmc.utils.visualizer',
+}
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value